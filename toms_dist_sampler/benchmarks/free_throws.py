@@ -0,0 +1,234 @@
+'''
+Benchmarks toms_dist_sampler.free_throws against the row-wise feature
+engineering in 1. Analysis.ipynb, and checks both produce the same features.
+
+free_throws.csv is not bundled, so by default a synthetic file with the same
+columns and formats is generated. Pass --csv to use the real data instead.
+
+Usage (with the package installed, e.g. pip install .):
+python benchmarks/free_throws.py
+python benchmarks/free_throws.py --rows 600000 --chunksize 100000
+python benchmarks/free_throws.py --csv ./data/input/free_throws.csv
+'''
+from datetime import time, timedelta
+import argparse
+import os
+import tempfile
+import timeit
+import numpy as np
+import pandas as pd
+
+from toms_dist_sampler.free_throws import FEATURE_COLUMNS, build_features
+
+
+TEAMS = [
+    'ATL', 'BOS', 'CHI', 'CLE', 'DAL', 'DEN', 'DET', 'GSW', 'HOU', 'LAL',
+    'MIA', 'MIL', 'NYK', 'OKC', 'PHX', 'SAS'
+]
+PLAYERS = ['Player {}'.format(i) for i in range(1500)]
+
+
+def synthetic_free_throws(rows, seed=0):
+    '''
+    Generates a DataFrame with the columns and string formats of
+    free_throws.csv.
+    '''
+    rng = np.random.RandomState(seed)
+
+    home = rng.choice(TEAMS, rows)
+    away = rng.choice(TEAMS, rows)
+    player = rng.choice(PLAYERS, rows)
+    made = rng.binomial(1, 0.75, rows)
+    attempt = rng.randint(1, 3, rows)
+
+    # Mostly regulation periods, with the occasional overtime up to period 8
+    period = np.minimum(rng.geometric(0.2, rows), 8).astype(float)
+    period = np.where(period > 4, period, rng.randint(1, 5, rows))
+    seconds = np.where(
+        period > 4, rng.randint(0, 301, rows), rng.randint(0, 721, rows)
+    )
+
+    season_start = rng.randint(2006, 2016, rows)
+
+    return pd.DataFrame({
+        'end_result': pd.Series(rng.randint(80, 130, rows)).astype(str) +
+        ' - ' + pd.Series(rng.randint(80, 130, rows)).astype(str),
+        'game': pd.Series(home) + ' - ' + pd.Series(away),
+        'game_id': rng.randint(261031013, 400900000, rows).astype(float),
+        'period': period.astype(float),
+        'play': pd.Series(player) + np.where(made, ' makes', ' misses') +
+        ' free throw ' + pd.Series(attempt).astype(str) + ' of 2',
+        'player': player,
+        'playoffs': np.where(rng.random_sample(rows) < 0.1, 'playoffs',
+                             'regular'),
+        'score': pd.Series(rng.randint(0, 130, rows)).astype(str) + ' - ' +
+        pd.Series(rng.randint(0, 130, rows)).astype(str),
+        'season': pd.Series(season_start).astype(str) + ' - ' +
+        pd.Series(season_start + 1).astype(str),
+        'shot_made': made,
+        'time': pd.Series(seconds // 60).astype(str) + ':' +
+        pd.Series(seconds % 60).astype(str).str.zfill(2),
+    })
+
+
+def notebook_features(path):
+    '''
+    The feature engineering from 1. Analysis.ipynb, unchanged apart from
+    being wrapped in a function.
+    '''
+    df = pd.read_csv(path)
+
+    df['throw_number'] = df['play'].str[-6]
+    df['home_team'] = df['game'].str[:3]
+    df['away_team'] = df['game'].str[6:9]
+
+    periods_remaining = {1: 3, 2: 2, 3: 1, 4: 0, 5: 0, 6: 0, 7: 0, 8: 0}
+    df['periods_elapsed'] = df['period'].astype(int)
+    df['periods_remaining'] = (
+        df['period'].replace(periods_remaining).astype(int)
+    )
+
+    in_overtime = {1: 0, 2: 0, 3: 0, 4: 0, 5: 1, 6: 1, 7: 1, 8: 1}
+    df['in_overtime'] = df['period'].replace(in_overtime).astype(int)
+
+    overtime_periods_played = {
+        1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 1, 7: 2, 8: 3
+    }
+    df['overtime_periods_played'] = (
+        df['period'].replace(overtime_periods_played).astype(int)
+    )
+
+    df['shot_taken'] = 1
+    df.rename(columns={'shot_made': 'shot_scored'}, inplace=True)
+    df['shot_missed'] = df['shot_scored'].replace({0: 1, 1: 0})
+    df['scored_missed'] = df['shot_scored'].replace(
+        {0: 'Missed', 1: 'Scored'}
+    )
+
+    def period_time_remaining(row):
+        time_list = row['time'].split(':')
+        return timedelta(
+            hours=0, minutes=int(time_list[0]), seconds=int(time_list[1])
+        )
+
+    df['period_time_remaining'] = df.apply(period_time_remaining, axis=1)
+
+    def period_time_elapsed(row):
+        period_length = time()
+
+        if row['in_overtime'] == 0:
+            period_length = timedelta(hours=0, minutes=12, seconds=0)
+
+        elif row['in_overtime'] == 1:
+            period_length = timedelta(hours=0, minutes=5, seconds=0)
+
+        return period_length - row['period_time_remaining']
+
+    df['period_time_elapsed'] = df.apply(period_time_elapsed, axis=1)
+
+    def game_time_remaining(row):
+        periods_mins_remaining = 0
+
+        if row['in_overtime'] == 0:
+            periods_mins_remaining = row['periods_remaining'] * 12
+
+        return (
+            timedelta(hours=0, minutes=periods_mins_remaining, seconds=0) +
+            row['period_time_remaining']
+        )
+
+    df['game_time_remaining'] = df.apply(game_time_remaining, axis=1)
+
+    def game_time_elapsed(row):
+        game_time_elapsed = None
+
+        if row['in_overtime'] == 0:
+            game_time_elapsed = (
+                timedelta(hours=0, minutes=48, seconds=0) -
+                row['game_time_remaining']
+            )
+
+        elif row['in_overtime'] == 1:
+            overtime_elapsed = row['overtime_periods_played'] * 5
+            game_time_elapsed = (
+                timedelta(minutes=48) + timedelta(minutes=overtime_elapsed) +
+                row['period_time_elapsed']
+            )
+
+        return game_time_elapsed
+
+    df['game_time_elapsed'] = df.apply(game_time_elapsed, axis=1)
+
+    return df[FEATURE_COLUMNS]
+
+
+def check_equal(expected, actual):
+    '''
+    Checks the vectorized features match the notebook's, ignoring the
+    differences in dtype.
+    '''
+    for column in FEATURE_COLUMNS:
+        a = expected[column]
+        b = actual[column]
+
+        if a.dtype == object or str(b.dtype) == 'category':
+            b = b.astype(object)
+            a = a.astype(object)
+
+        if str(a.dtype).startswith('timedelta'):
+            a = a.values.astype('timedelta64[ns]')
+            b = b.values.astype('timedelta64[ns]')
+
+        assert np.array_equal(np.asarray(a), np.asarray(b)), column
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--csv', help='Path to free_throws.csv')
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--chunksize', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.csv
+    if path is None:
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        os.close(handle)
+        synthetic_free_throws(args.rows).to_csv(path, index=False)
+
+    try:
+        rows = len(pd.read_csv(path, usecols=['time']))
+        print('Rows: {}'.format(rows))
+
+        expected = notebook_features(path)
+        check_equal(expected, build_features(path))
+        check_equal(expected, build_features(path, args.chunksize))
+        print('Features match the notebook')
+        print('')
+
+        approaches = [
+            ('notebook', lambda: notebook_features(path)),
+            ('build_features', lambda: build_features(path)),
+            ('build_features (chunked)',
+             lambda: build_features(path, args.chunksize)),
+        ]
+
+        baseline = None
+        print('{:<26}{:>10}{:>10}{:>10}'.format(
+            'approach', 'seconds', 'MB', 'speedup'
+        ))
+        for name, func in approaches:
+            seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+            megabytes = func().memory_usage(deep=True).sum() / 1e6
+            baseline = baseline or seconds
+            print('{:<26}{:>10.2f}{:>10.1f}{:>10.1f}'.format(
+                name, seconds, megabytes, baseline / seconds
+            ))
+
+    finally:
+        if args.csv is None:
+            os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+'''
+Throughput of a thread safe DistributionSampler shared between threads.
+
+Every thread draws from the same instance, and the script reports the total
+throughput for each thread count alongside the speedup over a single thread.
+numpy releases the GIL while filling the sample arrays and each thread has its
+own random stream, so throughput is expected to grow with the thread count up
+to the number of available cores. On a single core the speedup stays at about
+1.0, which shows the threads are not contending for a lock.
+
+The correctness checks for concurrent draws are in
+tests/test_thread_safety.py.
+
+Usage (with the package installed, e.g. pip install .):
+python benchmarks/thread_scaling.py
+python benchmarks/thread_scaling.py --size 1000000 --draws 50 --max-threads 8
+'''
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import time
+
+from toms_dist_sampler import DistributionSampler
+
+
+SPECS = [
+    dict(dist='Normal', mean=0, sd=1),
+    dict(dist='Poisson', lam=5),
+    dict(dist='Binomial', trials=10, prob=0.5),
+    dict(dist='Normal', mean=0, sd=1, lower=-1, upper=2),
+]
+
+
+def run(sampler, threads, draws, size):
+    '''
+    Runs draws calls to sampler.draw() on each of threads threads at once and
+    returns the elapsed time in seconds.
+    '''
+    def work(_):
+        for _ in range(draws):
+            sampler.draw(size=size)
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(work, range(threads)))
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=1000000)
+    parser.add_argument('--draws', type=int, default=20)
+    parser.add_argument('--max-threads', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    for spec in SPECS:
+        sampler = DistributionSampler(
+            size=args.size, thread_safe=True, seed=0, **spec
+        )
+        print(spec)
+        print('threads  seconds  values/s  speedup')
+
+        baseline = None
+        threads = 1
+        while threads <= args.max_threads:
+            elapsed = run(sampler, threads, args.draws, args.size)
+            rate = threads * args.draws * args.size / elapsed
+            baseline = baseline or rate
+            print('{:>7}  {:>7.2f}  {:>8.2e}  {:>7.2f}'.format(
+                threads, elapsed, rate, rate / baseline
+            ))
+            threads *= 2
+
+        print('')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+from toms_dist_sampler import DistributionSampler, bootstrap_ci
+from toms_dist_sampler.bootstrap import resample_counts, resample_indices
+
+
+@pytest.fixture(autouse=True)
+def seed():
+    np.random.seed(0)
+
+
+def naive_bootstrap(sample, ci, n_boot):
+    '''
+    Bootstrap intervals from a plain loop over np.random.choice resamples.
+    '''
+    stats = []
+    for _ in range(n_boot):
+        resample = np.random.choice(sample, size=len(sample))
+        stats.append([
+            resample.mean(), resample.std(), resample.min(), resample.max()
+        ])
+
+    alpha = (1 - ci) / 2
+    return np.percentile(stats, [alpha * 100, (1 - alpha) * 100], axis=0)
+
+
+@pytest.mark.parametrize('sample', [
+    np.random.RandomState(1).normal(10, 2, 500),
+    np.random.RandomState(2).poisson(5, 500),
+])
+def test_matches_naive_loop(sample):
+    intervals = bootstrap_ci(sample, ci=0.9, n_boot=4000)
+    naive = naive_bootstrap(sample, 0.9, 4000)
+
+    for i, key in enumerate(['Mean', 'Standard Deviation']):
+        width = naive[1, i] - naive[0, i]
+        assert intervals[key][0] == pytest.approx(naive[0, i], abs=width / 10)
+        assert intervals[key][1] == pytest.approx(naive[1, i], abs=width / 10)
+
+    # The exact extreme intervals fall on sample values near the naive ones
+    values = np.unique(sample)
+    for i, key in [(2, 'Minimum Value'), (3, 'Maximum Value')]:
+        for j in range(2):
+            position = np.searchsorted(values, intervals[key][j])
+            naive_position = np.searchsorted(values, naive[j, i])
+            assert abs(position - naive_position) <= 1
+
+
+def test_workers_do_not_change_results():
+    sample = np.random.normal(0, 1, 2000)
+
+    results = []
+    for workers in (1, 3):
+        np.random.seed(5)
+        results.append(bootstrap_ci(
+            sample, n_boot=200, max_memory=2 ** 16, workers=workers
+        ))
+
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize('sample', [
+    np.random.RandomState(3).poisson(5, 5000).astype(float),
+    # Heavy tailed samples, rounded so they take the count path
+    np.round(np.random.RandomState(4).lognormal(0, 2, 5000)),
+    np.round(np.random.RandomState(5).pareto(1.5, 5000), 1),
+    np.round(np.random.RandomState(6).standard_t(3, 5000), 1),
+])
+def test_count_path_agrees_with_index_path(sample):
+    values, counts = np.unique(sample, return_counts=True)
+    assert len(values) * 10 <= len(sample)
+    rng = np.random.RandomState(0)
+
+    by_counts = resample_counts(
+        values, counts / float(len(sample)), len(sample), 4000, rng
+    )
+    by_index = resample_indices(sample, 4000, rng)
+
+    for column in range(2):
+        expected = np.percentile(by_index[:, column], [2.5, 97.5])
+        width = expected[1] - expected[0]
+        assert np.percentile(by_counts[:, column], [2.5, 97.5]) == (
+            pytest.approx(expected, abs=width / 10)
+        )
+
+
+@pytest.mark.parametrize('sample', [
+    np.random.RandomState(7).lognormal(0, 2, 5000),
+    np.random.RandomState(8).pareto(1.5, 5000),
+])
+def test_heavy_tailed_intervals_match_index_resampling(sample):
+    intervals = bootstrap_ci(sample, n_boot=2000, max_memory=2 ** 22)
+    by_index = resample_indices(sample, 2000, np.random.RandomState(1))
+
+    for i, key in enumerate(['Mean', 'Standard Deviation']):
+        expected = np.percentile(by_index[:, i], [2.5, 97.5])
+        width = expected[1] - expected[0]
+        assert intervals[key] == pytest.approx(expected, abs=width / 10)
+
+
+@pytest.mark.parametrize('params', [
+    dict(ci=95),
+    dict(ci=0.0),
+    dict(ci=1),
+    dict(n_boot=0),
+    dict(n_boot=10.5),
+    dict(max_memory=-1),
+    dict(workers=0),
+])
+def test_invalid_parameters_raise(params):
+    with pytest.raises(ValueError):
+        bootstrap_ci(np.arange(10.0), **params)
+
+
+def test_invalid_sample_raises():
+    with pytest.raises(ValueError):
+        bootstrap_ci(np.array([]))
+
+    with pytest.raises(ValueError):
+        bootstrap_ci([1, 2, 3])
+
+
+def test_summarise_prints_intervals(capsys):
+    instance = DistributionSampler(1000, 'Normal', mean=0, sd=1)
+    instance.summarise(ci=0.95, n_boot=200)
+
+    out = capsys.readouterr().out
+    assert '95% Confidence Intervals' in out
+    for key in ['Mean', 'Standard Deviation', 'Minimum Value',
+                'Maximum Value']:
+        assert '{}: ('.format(key) in out
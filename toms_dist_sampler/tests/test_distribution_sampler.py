@@ -0,0 +1,168 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from toms_dist_sampler import DistributionSampler, distribution_sampler
+
+
+@pytest.fixture(autouse=True)
+def seed():
+    np.random.seed(0)
+
+
+@pytest.mark.parametrize('dist, params, lower, upper', [
+    ('Normal', dict(mean=50, sd=30), 0, 100),
+    ('Normal', dict(mean=0, sd=1), None, -2),
+    ('Poisson', dict(lam=5), None, 3),
+    ('Poisson', dict(lam=5), 2.5, 8),
+    ('Binomial', dict(trials=10, prob=0.5), 2.5, 4),
+])
+def test_bounded_sample_within_bounds(dist, params, lower, upper):
+    s = distribution_sampler(
+        10000, dist, lower=lower, upper=upper, **params
+    )
+
+    assert len(s) == 10000
+    if lower is not None:
+        assert s.min() >= lower
+    if upper is not None:
+        assert s.max() <= upper
+
+
+def test_truncated_normal_matches_truncnorm():
+    s = distribution_sampler(
+        200000, 'Normal', mean=50, sd=30, lower=0, upper=100
+    )
+    expected = stats.truncnorm(-50 / 30, 50 / 30, loc=50, scale=30)
+
+    assert s.mean() == pytest.approx(expected.mean(), abs=0.2)
+    assert s.std() == pytest.approx(expected.std(), abs=0.2)
+
+
+def test_truncated_normal_far_tail():
+    s = distribution_sampler(100000, 'Normal', mean=0, sd=1, lower=8)
+    expected = stats.truncnorm(8, np.inf)
+
+    assert s.min() >= 8
+    assert np.isfinite(s).all()
+    assert s.mean() == pytest.approx(expected.mean(), abs=0.01)
+
+
+@pytest.mark.parametrize('lower, upper', [
+    (50, None),
+    (50, 50.01),
+    (None, -1000),
+])
+def test_truncated_normal_beyond_cdf_precision(lower, upper):
+    s = distribution_sampler(
+        100000, 'Normal', mean=0, sd=1, lower=lower, upper=upper
+    )
+    a = -np.inf if lower is None else lower
+    b = np.inf if upper is None else upper
+
+    assert np.isfinite(s).all()
+    assert s.min() >= a
+    assert s.max() <= b
+
+    # scipy warns computing the skew of these tails, which isn't used here
+    with np.errstate(invalid='ignore'):
+        expected = stats.truncnorm(a, b).mean()
+
+    assert s.mean() == pytest.approx(expected, abs=1e-4)
+
+
+@pytest.mark.parametrize('lam', [1e10, 1e12])
+def test_truncated_poisson_large_lam(lam):
+    s = distribution_sampler(5, 'Poisson', lam=lam, lower=0)
+
+    assert len(s) == 5
+    assert (np.abs(s - lam) < 10 * np.sqrt(lam)).all()
+
+
+def test_truncated_poisson_matches_moments():
+    s = distribution_sampler(200000, 'Poisson', lam=5, lower=2, upper=8)
+
+    k = np.arange(2, 9)
+    pmf = stats.poisson(5).pmf(k)
+    pmf /= pmf.sum()
+    mean = (k * pmf).sum()
+    sd = np.sqrt((k ** 2 * pmf).sum() - mean ** 2)
+
+    assert np.issubdtype(s.dtype, np.integer)
+    assert s.mean() == pytest.approx(mean, abs=0.02)
+    assert s.std() == pytest.approx(sd, abs=0.02)
+
+
+@pytest.mark.parametrize('dist, params, bounds', [
+    ('Normal', dict(mean=0, sd=1), dict(lower=3, upper=2)),
+    ('Poisson', dict(lam=5), dict(lower=2.2, upper=2.8)),
+    ('Binomial', dict(trials=10, prob=0.5), dict(lower=20)),
+    ('Normal', dict(mean=0, sd=1), dict(lower='0')),
+    ('Normal', dict(mean=0, sd=1), dict(lower=float('nan'))),
+    ('Poisson', dict(lam=5), dict(upper=np.nan)),
+    ('Normal', dict(mean=0, sd=1), dict(upper=True)),
+])
+def test_invalid_bounds_raise(dist, params, bounds):
+    with pytest.raises(ValueError):
+        distribution_sampler(10, dist, **dict(params, **bounds))
+
+
+@pytest.mark.parametrize('dist, params, bounds', [
+    ('Binomial', dict(trials=10, prob=0.0), dict(lower=1)),
+    ('Binomial', dict(trials=10, prob=1.0), dict(upper=5)),
+    ('Poisson', dict(lam=0), dict(lower=1)),
+])
+def test_zero_mass_bounds_raise(dist, params, bounds):
+    with pytest.raises(ValueError, match='negligible probability mass'):
+        distribution_sampler(10, dist, **dict(params, **bounds))
+
+
+def test_sample_parameters_record_bounds():
+    instance = DistributionSampler(1000, 'Poisson', lam=5, lower=2, upper=6)
+
+    assert instance.sample_parameters['Lower Bound'] == 2
+    assert instance.sample_parameters['Upper Bound'] == 6
+    assert instance.sample.min() >= 2
+    assert instance.sample.max() <= 6
+
+    instance.draw(lower=None, upper=None)
+
+    assert 'Lower Bound' not in instance.sample_parameters
+    assert 'Upper Bound' not in instance.sample_parameters
+
+
+def test_numpy_and_infinite_bounds():
+    s = distribution_sampler(
+        1000, 'Poisson', lam=5, lower=np.int64(2), upper=np.float64(6)
+    )
+
+    assert s.min() >= 2
+    assert s.max() <= 6
+
+    instance = DistributionSampler(1000, 'Normal', mean=0, sd=1)
+    instance.draw(lower=-float('inf'), upper=float('inf'))
+
+    assert instance.upper == np.inf
+    assert np.isfinite(instance.sample).all()
+
+
+def test_truncated_normal_records_sample_moments():
+    instance = DistributionSampler(
+        100000, 'Normal', mean=0, sd=1, lower=0
+    )
+    expected = stats.truncnorm(0, np.inf)
+
+    assert instance.sample_parameters['Mean'] == pytest.approx(
+        expected.mean(), abs=0.01
+    )
+    assert instance.sample_parameters['Standard Deviation'] == (
+        pytest.approx(expected.std(), abs=0.01)
+    )
+    assert '{}'.format(instance.sample_parameters['Mean']) in (
+        instance.sample_parameters['graph_string']
+    )
+
+    instance.draw(lower=None)
+
+    assert instance.sample_parameters['Mean'] == 0
+    assert instance.sample_parameters['Standard Deviation'] == 1
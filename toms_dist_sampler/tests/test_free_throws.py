@@ -0,0 +1,216 @@
+from datetime import time, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+
+from toms_dist_sampler.free_throws import (
+    FEATURE_COLUMNS, build_features, period_features, time_to_seconds
+)
+
+
+# Rows in the formats of free_throws.csv, covering every period up to the
+# fourth overtime and a missing clock time.
+ROWS = [
+    ('106 - 114', 'PHX - LAL', 261031013.0, 1.0,
+     'Andrew Bynum makes free throw 1 of 2', 'Andrew Bynum', 'regular',
+     '0 - 1', '2006 - 2007', 1, '11:45'),
+    ('106 - 114', 'PHX - LAL', 261031013.0, 2.0,
+     'Andrew Bynum misses free throw 2 of 2', 'Andrew Bynum', 'regular',
+     '30 - 28', '2006 - 2007', 0, '0:00'),
+    ('106 - 114', 'PHX - LAL', 261031013.0, 3.0,
+     'Shawn Marion makes free throw 1 of 1', 'Shawn Marion', 'regular',
+     '60 - 58', '2006 - 2007', 1, '7:26'),
+    ('106 - 114', 'PHX - LAL', 261031013.0, 4.0,
+     'Kobe Bryant makes free throw 2 of 3', 'Kobe Bryant', 'regular',
+     '90 - 88', '2006 - 2007', 1, '12:00'),
+    ('120 - 125', 'BOS - MIA', 400900001.0, 5.0,
+     'Ray Allen makes free throw 1 of 2', 'Ray Allen', 'playoffs',
+     '100 - 100', '2012 - 2013', 1, '4:59'),
+    ('120 - 125', 'BOS - MIA', 400900001.0, 6.0,
+     'LeBron James misses free throw 1 of 2', 'LeBron James', 'playoffs',
+     '106 - 104', '2012 - 2013', 0, '0:01'),
+    ('120 - 125', 'BOS - MIA', 400900001.0, 7.0,
+     'Ray Allen makes free throw 2 of 2', 'Ray Allen', 'playoffs',
+     '110 - 110', '2012 - 2013', 1, '2:30'),
+    ('120 - 125', 'BOS - MIA', 400900001.0, 8.0,
+     'LeBron James makes free throw 1 of 2', 'LeBron James', 'playoffs',
+     '118 - 120', '2012 - 2013', 1, '5:00'),
+    ('120 - 125', 'BOS - MIA', 400900001.0, 8.0,
+     'LeBron James makes free throw 2 of 2', 'LeBron James', 'playoffs',
+     '118 - 121', '2012 - 2013', 1, None),
+    ('99 - 101', 'CHI - DET', 300500002.0, 4.0,
+     'Ben Wallace misses free throw 1 of 2', 'Ben Wallace', 'regular',
+     '97 - 99', '2009 - 2010', 0, '0:35'),
+]
+
+COLUMNS = [
+    'end_result', 'game', 'game_id', 'period', 'play', 'player', 'playoffs',
+    'score', 'season', 'shot_made', 'time'
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'free_throws.csv'
+    pd.DataFrame(ROWS, columns=COLUMNS).to_csv(path, index=False)
+    return str(path)
+
+
+def notebook_features(path):
+    '''
+    The feature engineering from 1. Analysis.ipynb, unchanged apart from
+    returning NaT for a missing clock time rather than failing.
+    '''
+    df = pd.read_csv(path)
+
+    df['throw_number'] = df['play'].str[-6]
+    df['home_team'] = df['game'].str[:3]
+    df['away_team'] = df['game'].str[6:9]
+
+    periods_remaining = {1: 3, 2: 2, 3: 1, 4: 0, 5: 0, 6: 0, 7: 0, 8: 0}
+    df['periods_elapsed'] = df['period'].astype(int)
+    df['periods_remaining'] = (
+        df['period'].replace(periods_remaining).astype(int)
+    )
+
+    in_overtime = {1: 0, 2: 0, 3: 0, 4: 0, 5: 1, 6: 1, 7: 1, 8: 1}
+    df['in_overtime'] = df['period'].replace(in_overtime).astype(int)
+
+    overtime_periods_played = {
+        1: 0, 2: 0, 3: 0, 4: 0, 5: 0, 6: 1, 7: 2, 8: 3
+    }
+    df['overtime_periods_played'] = (
+        df['period'].replace(overtime_periods_played).astype(int)
+    )
+
+    df['shot_taken'] = 1
+    df.rename(columns={'shot_made': 'shot_scored'}, inplace=True)
+    df['shot_missed'] = df['shot_scored'].replace({0: 1, 1: 0})
+    df['scored_missed'] = df['shot_scored'].replace(
+        {0: 'Missed', 1: 'Scored'}
+    )
+
+    def period_time_remaining(row):
+        if pd.isnull(row['time']):
+            return pd.NaT
+
+        time_list = row['time'].split(':')
+        return timedelta(
+            hours=0, minutes=int(time_list[0]), seconds=int(time_list[1])
+        )
+
+    df['period_time_remaining'] = df.apply(period_time_remaining, axis=1)
+
+    def period_time_elapsed(row):
+        period_length = time()
+
+        if row['in_overtime'] == 0:
+            period_length = timedelta(hours=0, minutes=12, seconds=0)
+
+        elif row['in_overtime'] == 1:
+            period_length = timedelta(hours=0, minutes=5, seconds=0)
+
+        return period_length - row['period_time_remaining']
+
+    df['period_time_elapsed'] = df.apply(period_time_elapsed, axis=1)
+
+    def game_time_remaining(row):
+        periods_mins_remaining = 0
+
+        if row['in_overtime'] == 0:
+            periods_mins_remaining = row['periods_remaining'] * 12
+
+        return (
+            timedelta(hours=0, minutes=periods_mins_remaining, seconds=0) +
+            row['period_time_remaining']
+        )
+
+    df['game_time_remaining'] = df.apply(game_time_remaining, axis=1)
+
+    def game_time_elapsed(row):
+        game_time_elapsed = None
+
+        if row['in_overtime'] == 0:
+            game_time_elapsed = (
+                timedelta(hours=0, minutes=48, seconds=0) -
+                row['game_time_remaining']
+            )
+
+        elif row['in_overtime'] == 1:
+            overtime_elapsed = row['overtime_periods_played'] * 5
+            game_time_elapsed = (
+                timedelta(minutes=48) + timedelta(minutes=overtime_elapsed) +
+                row['period_time_elapsed']
+            )
+
+        return game_time_elapsed
+
+    df['game_time_elapsed'] = df.apply(game_time_elapsed, axis=1)
+
+    return df[FEATURE_COLUMNS]
+
+
+@pytest.mark.parametrize('chunksize', [None, 1, 3, 100])
+def test_build_features_matches_notebook(csv_path, chunksize):
+    expected = notebook_features(csv_path)
+    actual = build_features(csv_path, chunksize)
+
+    assert list(actual.columns) == FEATURE_COLUMNS
+    assert len(actual) == len(expected)
+
+    for column in FEATURE_COLUMNS:
+        a = expected[column]
+        b = actual[column]
+
+        if str(a.dtype).startswith('timedelta'):
+            pd.testing.assert_series_equal(
+                b.astype('timedelta64[ns]'), a.astype('timedelta64[ns]'),
+                check_names=False
+            )
+
+        else:
+            assert b.astype(object).tolist() == a.astype(object).tolist(), (
+                column
+            )
+
+
+def test_build_features_dtypes(csv_path):
+    features = build_features(csv_path, chunksize=3)
+
+    for column in ['period', 'in_overtime', 'shot_scored', 'shot_missed']:
+        assert features[column].dtype == np.int8
+
+    for column in ['home_team', 'away_team', 'throw_number', 'scored_missed']:
+        assert str(features[column].dtype) == 'category'
+
+    assert features['game_time_remaining'].isnull().sum() == 1
+
+
+def test_time_to_seconds():
+    time = pd.Series(['11:45', '0:00', None, '12:00', '0:00'])
+    seconds = time_to_seconds(time)
+
+    np.testing.assert_array_equal(
+        seconds, [705.0, 0.0, np.nan, 720.0, 0.0]
+    )
+
+    missing = time_to_seconds(pd.Series([None, None], dtype='category'))
+    assert np.isnan(missing).all()
+
+
+def test_period_features():
+    period = np.arange(1, 11)
+    periods_remaining, in_overtime, overtime_periods_played = (
+        period_features(period)
+    )
+
+    np.testing.assert_array_equal(
+        periods_remaining, [3, 2, 1, 0, 0, 0, 0, 0, 0, 0]
+    )
+    np.testing.assert_array_equal(
+        in_overtime, [0, 0, 0, 0, 1, 1, 1, 1, 1, 1]
+    )
+    np.testing.assert_array_equal(
+        overtime_periods_played, [0, 0, 0, 0, 0, 1, 2, 3, 4, 5]
+    )
+    assert in_overtime.dtype == np.int8
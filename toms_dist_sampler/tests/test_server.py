@@ -0,0 +1,229 @@
+import json
+import os
+import tempfile
+import threading
+import numpy as np
+import pytest
+
+from toms_dist_sampler import server as server_module
+from toms_dist_sampler.server import (
+    MAX_SIZE, SampleBatcher, SamplerClient, make_server
+)
+
+
+@pytest.fixture(params=['tcp', 'unix'])
+def server(request):
+    if request.param == 'tcp':
+        address = ('127.0.0.1', 0)
+
+    else:
+        directory = tempfile.mkdtemp()
+        address = os.path.join(directory, 'sampler.sock')
+
+    server = make_server(address, batch_window=0.05, seed=0)
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.01,), daemon=True
+    )
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+    if request.param == 'unix':
+        os.unlink(address)
+        os.rmdir(directory)
+
+
+@pytest.fixture
+def client(server):
+    client = SamplerClient(server.server_address)
+    yield client
+    client.close()
+
+
+@pytest.mark.parametrize('spec, dtype', [
+    (dict(dist='Normal', mean=0, sd=1), np.dtype('<f8')),
+    (dict(dist='Normal', mean=0, sd=1, lower=0), np.dtype('<f8')),
+    (dict(dist='Poisson', lam=5), np.dtype('<i8')),
+    (dict(dist='Binomial', trials=10, prob=0.5, upper=4), np.dtype('<i8')),
+])
+def test_sample_dtype_and_length(client, spec, dtype):
+    s = client.sample(1234, **spec)
+
+    assert s.dtype == dtype
+    assert len(s) == 1234
+
+    if 'lower' in spec:
+        assert s.min() >= spec['lower']
+
+    if 'upper' in spec:
+        assert s.max() <= spec['upper']
+
+
+def test_concurrent_requests_are_coalesced(server):
+    # Slow draws keep requests in flight, as under load, so that later
+    # requests wait for others to join their batch.
+    draw = server.batcher.sampler.draw
+
+    def slow_draw(**params):
+        threading.Event().wait(0.1)
+        return draw(**params)
+
+    server.batcher.sampler.draw = slow_draw
+    threads = 8
+    barrier = threading.Barrier(threads)
+    batch_sizes = []
+    samples = []
+    spec = json.dumps({'size': 100, 'dist': 'Poisson', 'lam': 3})
+
+    def work():
+        client = SamplerClient(server.server_address)
+        barrier.wait()
+        response, body = client._request(
+            'POST', '/sample', spec.encode('utf-8')
+        )
+        batch_sizes.append(int(response.getheader('X-Batch-Size')))
+        samples.append(np.frombuffer(body, response.getheader('X-Dtype')))
+        client.close()
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        worker.join()
+
+    assert len(samples) == threads
+    assert all(len(s) == 100 for s in samples)
+    assert max(batch_sizes) > 1
+
+    client = SamplerClient(server.server_address)
+    assert client.metrics()['mean_batch_size'] > 1
+    client.close()
+
+
+def test_batch_total_is_capped(monkeypatch):
+    monkeypatch.setattr(server_module, 'MAX_SIZE', 100)
+    batcher = SampleBatcher(window=0.05, seed=0)
+    draw = batcher.sampler.draw
+    drawn = []
+
+    def slow_draw(**params):
+        drawn.append(params['size'])
+        threading.Event().wait(0.05)
+        return draw(**params)
+
+    batcher.sampler.draw = slow_draw
+    threads = 6
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def work():
+        barrier.wait()
+        results.append(batcher.sample(
+            {'size': 40, 'dist': 'Poisson', 'lam': 3}
+        ))
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        worker.join()
+
+    assert len(results) == threads
+    assert all(len(s) == 40 for s, _ in results)
+    assert sum(drawn) == threads * 40
+    assert max(drawn) <= 100
+    assert max(batch_size for _, batch_size in results) > 1
+
+
+def test_uncontended_request_skips_batch_window(client):
+    # The 0.05 second window is only waited when other requests are in flight
+    client.sample(10, 'Poisson', lam=3)
+    latency = client.metrics()['latency_seconds']
+
+    assert latency['max'] < 0.05
+
+
+@pytest.mark.parametrize('spec, error', [
+    (dict(size=10, dist='Foo'), ValueError),
+    (dict(size=10.5, dist='Poisson', lam=5), ValueError),
+    (dict(size=0, dist='Poisson', lam=5), ValueError),
+    (dict(size=MAX_SIZE + 1, dist='Poisson', lam=5), ValueError),
+    (dict(size=10, dist='Normal', mean=0), NameError),
+    (dict(size=10, dist='Poisson', lam=5, lower=3, upper=2), ValueError),
+])
+def test_invalid_spec_raises(client, spec, error):
+    with pytest.raises(error):
+        client.sample(**spec)
+
+
+@pytest.mark.parametrize('body', [
+    b'not json', b'[1, 2]', b'{"size": 10, "dist": "Poisson", "lam": [1]}',
+    b'{"size": 10, "dist": "Poisson", "lam": 5, "colour": "red"}',
+])
+def test_malformed_request_returns_400(client, body):
+    response, content = client._request('POST', '/sample', body)
+    error = json.loads(content.decode('utf-8'))
+
+    assert response.status == 400
+    assert error['type'] == 'ValueError'
+
+
+@pytest.mark.parametrize('length', ['abc', '-1'])
+def test_malformed_content_length_returns_400(client, length):
+    client.connection.request(
+        'POST', '/sample', headers={'Content-Length': length}
+    )
+    response = client.connection.getresponse()
+    error = json.loads(response.read().decode('utf-8'))
+
+    assert response.status == 400
+    assert 'Content-Length' in error['error']
+
+
+def test_server_failure_returns_500(server, client):
+    def fail(**params):
+        raise MemoryError('out of memory')
+
+    server.batcher.sampler.draw = fail
+
+    with pytest.raises(RuntimeError, match='MemoryError'):
+        client.sample(10, 'Poisson', lam=5)
+
+    # The connection is still usable and the failure is counted
+    assert client.metrics()['errors'] == 1
+
+
+def test_unknown_path_returns_404(client):
+    response, _ = client._request('GET', '/nothing')
+    assert response.status == 404
+
+    response, _ = client._request('POST', '/nothing', b'{}')
+    assert response.status == 404
+
+
+def test_metrics(client):
+    client.sample(100, 'Normal', mean=0, sd=1)
+    client.sample(50, 'Poisson', lam=5)
+
+    with pytest.raises(ValueError):
+        client.sample(10, 'Foo')
+
+    metrics = client.metrics()
+
+    assert metrics['requests'] == 3
+    assert metrics['errors'] == 1
+    assert metrics['batches'] == 2
+    assert metrics['values'] == 150
+    assert metrics['bytes'] == 150 * 8
+    assert metrics['mean_batch_size'] == 1
+    assert metrics['requests_per_second'] > 0
+    assert metrics['values_per_second'] > 0
+    assert metrics['uptime_seconds'] > 0
+    assert set(metrics['latency_seconds']) == {
+        'mean', 'p50', 'p90', 'p99', 'max'
+    }
@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import numpy as np
+import pytest
+
+from toms_dist_sampler import DistributionSampler
+
+
+PARAMETERS = dict(
+    size=100, dist='Normal', mean=0, sd=1, lam=None, trials=None, prob=None,
+    lower=None, upper=None
+)
+
+OVERRIDES = [
+    dict(size=50),
+    dict(size=200, mean=100, sd=0.1),
+    dict(size=300, lower=-0.5, upper=0.5),
+    dict(dist='Poisson', lam=4, mean=None, sd=None),
+    dict(dist='Binomial', trials=10, prob=0.2, mean=None, sd=None, upper=3),
+]
+
+
+def check_sample(s, overrides):
+    params = dict(PARAMETERS, **overrides)
+
+    assert len(s) == params['size']
+
+    if params['lower'] is not None:
+        assert s.min() >= params['lower']
+
+    if params['upper'] is not None:
+        assert s.max() <= params['upper']
+
+    if params['dist'] == 'Normal':
+        assert s.dtype == np.float64
+        assert abs(s.mean() - params['mean']) < 6 * params['sd']
+
+    else:
+        assert np.issubdtype(s.dtype, np.integer)
+
+
+def test_concurrent_draws_with_overrides():
+    instance = DistributionSampler(thread_safe=True, seed=0, **PARAMETERS)
+    barrier = threading.Barrier(16)
+
+    def work(i):
+        barrier.wait()
+        for j in range(50):
+            overrides = OVERRIDES[(i + j) % len(OVERRIDES)]
+            check_sample(instance.draw(**overrides), overrides)
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(work, range(16)))
+
+    # The instance is never updated by thread safe draws
+    for key, value in PARAMETERS.items():
+        assert getattr(instance, key) == value
+
+    assert instance.sample is None
+    assert instance.sample_parameters == {}
+
+
+def test_invalid_overrides_leave_instance_unchanged():
+    instance = DistributionSampler(thread_safe=True, seed=0, **PARAMETERS)
+
+    with pytest.raises(ValueError):
+        instance.draw(size=1.5)
+
+    with pytest.raises(ValueError):
+        instance.draw(lower=1, upper=0)
+
+    assert instance.size == 100
+    assert instance.lower is None
+
+
+def test_no_draw_on_creation():
+    instance = DistributionSampler(thread_safe=True, **PARAMETERS)
+
+    assert instance.sample is None
+    assert 0 <= instance.seed < 2 ** 32
+
+
+def test_same_seed_gives_same_first_stream():
+    a = DistributionSampler(thread_safe=True, seed=7, **PARAMETERS)
+    b = DistributionSampler(thread_safe=True, seed=7, **PARAMETERS)
+    c = DistributionSampler(thread_safe=True, seed=8, **PARAMETERS)
+
+    # The first thread to draw gets the first stream, whichever thread it is
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        first = executor.submit(a.draw).result()
+
+    assert np.array_equal(first, b.draw())
+    assert not np.array_equal(first, c.draw())
+
+
+def test_threads_get_independent_streams():
+    instance = DistributionSampler(thread_safe=True, seed=7, **PARAMETERS)
+    barrier = threading.Barrier(4)
+
+    def work(_):
+        barrier.wait()
+        return instance.draw()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        samples = list(executor.map(work, range(4)))
+
+    for i in range(4):
+        for j in range(i + 1, 4):
+            assert not np.array_equal(samples[i], samples[j])
@@ -1,13 +1,28 @@
+from collections import namedtuple
+import itertools
+import threading
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
 
+from .bootstrap import bootstrap_ci
+from .distribution_sampler import (
+    generate_binomial, generate_normal, generate_poisson, validate_bounds
+)
+
+
+# An immutable snapshot of the sampling parameters, used by thread safe draws
+Parameters = namedtuple(
+    'Parameters',
+    ['size', 'dist', 'mean', 'sd', 'lam', 'trials', 'prob', 'lower', 'upper']
+)
+
 
 class DistributionSampler:
     def __init__(
         self, size=None, dist=None, mean=None, sd=None, lam=None, trials=None,
-        prob=None
+        prob=None, lower=None, upper=None, thread_safe=False, seed=None
     ):
         '''
 
@@ -63,6 +78,31 @@ class DistributionSampler:
         Applicable to Binomial distributions only. The prob parameter is used
         to dicitate the probability of a trial being successful.
 
+        lower: float / int , optional
+
+        The smallest value that may be drawn. Applicable to all distributions.
+
+        upper: float / int , optional
+
+        The largest value that may be drawn. Applicable to all distributions.
+
+        thread_safe: bool , optional
+
+        Defaults to False. Setting this to True allows a single instance to be
+        shared across threads. Each call to draw() then takes a snapshot of
+        the parameters (with any passed to draw() applied to the snapshot
+        only), draws from a random stream private to the calling thread and
+        returns the sample without updating the instance. The sample and
+        sample_parameters attributes are therefore not set, and no sample is
+        drawn upon creation of the instance.
+
+        seed: integer , optional
+
+        Applicable to thread safe instances only. Seeds the per-thread random
+        streams, with each thread receiving an independent stream derived
+        from the seed and the order in which threads first draw. Defaults to
+        a seed taken from the global numpy random state.
+
         Notes
         -----
 
@@ -70,6 +110,10 @@ class DistributionSampler:
         details, check the API Reference material here:
         https://docs.scipy.org/doc/numpy-1.15.1/reference/
 
+        Set the parameters of a thread safe instance before sharing it between
+        threads, and pass per-call variations to draw() instead of calling
+        set_parameters().
+
         Examples
         --------
 
@@ -90,6 +134,13 @@ class DistributionSampler:
         Instance.prob = 0.5
         s = Instance.draw()
 
+        Sharing an instance between threads:
+        Instance = DistributionSampler(
+            1000, 'Normal', mean=0, sd=5, thread_safe=True, seed=42
+        )
+        s = Instance.draw()
+        s = Instance.draw(size=500)
+
         '''
 
         self.size = size
@@ -99,12 +150,24 @@ class DistributionSampler:
         self.lam = lam
         self.trials = trials
         self.prob = prob
+        self.lower = lower
+        self.upper = upper
         self.sample = None
         self.sample_parameters = {}
+        self.thread_safe = thread_safe
+
+        if thread_safe:
+            if seed is None:
+                seed = np.random.randint(0, 2 ** 32 - 1, dtype=np.int64)
+
+            self.seed = seed
+            self._local = threading.local()
+            self._streams = itertools.count()
+            self._streams_lock = threading.Lock()
 
         # If the parameters are filled upon creation of the instance, run the
         # draw method.
-        if (size is not None) and (dist is not None):
+        if (size is not None) and (dist is not None) and (not thread_safe):
             if (mean is not None) and (sd is not None):
                 self.draw()
 
@@ -156,6 +219,8 @@ class DistributionSampler:
         print('lam: {}'.format(self.lam))
         print('trials: {}'.format(self.trials))
         print('prob: {}'.format(self.prob))
+        print('lower: {}'.format(self.lower))
+        print('upper: {}'.format(self.upper))
 
     def print_sample(self):
         '''
@@ -202,7 +267,8 @@ class DistributionSampler:
             print(self.sample)
 
     def set_parameters(
-        self, size='', dist='', mean='', sd='', lam='', trials='', prob=''
+        self, size='', dist='', mean='', sd='', lam='', trials='', prob='',
+        lower='', upper=''
     ):
         '''
 
@@ -248,6 +314,14 @@ class DistributionSampler:
         Applicable to Binomial distributions only. The prob parameter is used
         to dicitate the probability of a trial being successful.
 
+        lower: float / int , optional
+
+        The smallest value that may be drawn. Applicable to all distributions.
+
+        upper: float / int , optional
+
+        The largest value that may be drawn. Applicable to all distributions.
+
 
         Returns
         -------
@@ -278,35 +352,42 @@ class DistributionSampler:
                 pass
             else:
                 # This is a hack to get around exec not resolving quotes.
-                if key == 'dist':
-                    self.dist = value
+                # The bounds are assigned directly too, as exec can't resolve
+                # infinite floats (e.g. float('inf') formats as inf).
+                if key in ['dist', 'lower', 'upper']:
+                    setattr(self, key, value)
 
                 else:
                     exec('self.{} = {}'.format(key, value))
 
-    def _validate_parameters(self):
+    def _validate_parameters(self, params=None):
         '''
         Private function to validate the input parameters, called during the
         draw() method. If the parameters are not valid, an error message will
-        display with instructions on how to input valid parameters
+        display with instructions on how to input valid parameters.
+
+        Validates the instance attributes, or a Parameters snapshot if one is
+        passed.
         '''
+        if params is None:
+            params = self
 
         # Mandatory parameter error handling
 
-        if self.dist not in ['Normal', 'Poisson', 'Binomial']:
+        if params.dist not in ['Normal', 'Poisson', 'Binomial']:
             raise ValueError(
                 "The dist parameter is mandatory and  must equal 'Normal', "
                 "'Poisson', or 'Binomial'"
             )
 
-        if not isinstance(self.size, int):
+        if not isinstance(params.size, int):
             raise ValueError(
                 'The size parameter is mandatory and  must be an integer.'
             )
 
         # Distribution Specific Error Handling
 
-        if self.size is None:
+        if params.size is None:
             raise ValueError(
                 'You need to set a sample size prior to '
                 '. calling the draw method. This must be an integer. E.g. '
@@ -316,7 +397,7 @@ class DistributionSampler:
                 'draw() method. E.g. Instance.draw(size=10000)'
             )
 
-        if self.dist is None:
+        if params.dist is None:
             raise ValueError(
                 'You need to set a dist parameter to specify the type of '
                 'distribution prior to calling the draw method. Available '
@@ -328,9 +409,9 @@ class DistributionSampler:
                 'draw() method. E.g. Instance.draw(dist="Normal")'
             )
 
-        if self.dist == 'Normal':
+        if params.dist == 'Normal':
             # Raise an error if the mean or sd parameters aren't set
-            if (self.mean is None) or (self.sd is None):
+            if (params.mean is None) or (params.sd is None):
                 raise NameError(
                     "The mean and sd parameters must be set where the dist is"
                     "set to 'Normal'.  Parameters can be input either using "
@@ -341,8 +422,8 @@ class DistributionSampler:
 
             # Raise a warning if irrelevent parameters are provided
             elif (
-                (self.lam is not None) or (self.trials is not None) or
-                (self.prob is not None)
+                (params.lam is not None) or (params.trials is not None) or
+                (params.prob is not None)
             ):
                 warnings.warn(
                     'The lam, trials and prob parameters are not used in the'
@@ -350,9 +431,9 @@ class DistributionSampler:
                     'will be ignored.\n'
                 )
 
-        if self.dist == 'Poisson':
+        if params.dist == 'Poisson':
             # Raise an error if the lam parameter isn't set
-            if self.lam is None:
+            if params.lam is None:
                 raise NameError(
                     "The lam parameter must be set where dist is set to "
                     "'Poisson'. 'Parameters can be input either using the "
@@ -364,8 +445,8 @@ class DistributionSampler:
 
             # Raise a warning if irrelevent parameters are provided
             elif (
-                (self.mean is not None) or (self.sd is not None) or
-                (self.trials is not None) or (self.prob is not None)
+                (params.mean is not None) or (params.sd is not None) or
+                (params.trials is not None) or (params.prob is not None)
             ):
                 warnings.warn(
                     'The mean, sd, trials and prob parameters are not used in '
@@ -373,9 +454,9 @@ class DistributionSampler:
                     'poisson distribution. These parameters will be ignored.\n'
                 )
 
-        if self.dist == 'Binomial':
+        if params.dist == 'Binomial':
             # Raise an error if the trials or prob parameters aren't set
-            if (self.trials is None) or (self.prob is None):
+            if (params.trials is None) or (params.prob is None):
                 raise NameError(
                     "The trials and prob parameters must be set where dist is"
                     " 'Binomial'. 'Parameters can be input either using the "
@@ -386,8 +467,8 @@ class DistributionSampler:
 
             # Raise a warning if irrelevent parameters are provided
             elif (
-                (self.mean is not None) or (self.sd is not None)
-                or (self.lam is not None)
+                (params.mean is not None) or (params.sd is not None)
+                or (params.lam is not None)
             ):
                 warnings.warn(
                     "The mean, sd and lam parameters are not used in the "
@@ -395,8 +476,72 @@ class DistributionSampler:
                     "will be ignored.\n"
                 ) 
 
+        validate_bounds(params.dist, params.lower, params.upper)
+
+    def _snapshot(self, **overrides):
+        '''
+        Private function to take an immutable snapshot of the parameters,
+        called during the draw() method of thread safe instances. Any
+        overrides other than '' replace the instance values in the snapshot
+        only, leaving the instance unchanged.
+        '''
+        values = {}
+        for key in Parameters._fields:
+            value = overrides.get(key, '')
+            if value == '':
+                value = getattr(self, key)
+
+            values[key] = value
+
+        return Parameters(**values)
+
+    def _thread_rng(self):
+        '''
+        Private function returning the random state of the calling thread,
+        creating it on the thread's first draw. Each thread's stream is
+        seeded with the instance seed and a unique stream number, so threads
+        never share or contend for a random state.
+        '''
+        rng = getattr(self._local, 'rng', None)
+
+        if rng is None:
+            with self._streams_lock:
+                stream = next(self._streams)
+
+            rng = np.random.RandomState([self.seed, stream])
+            self._local.rng = rng
+
+        return rng
+
+    @staticmethod
+    def _generate(params, rng):
+        '''
+        Private function to generate a sample from the distribution described
+        by params (the instance or a Parameters snapshot) using the random
+        state rng.
+        '''
+        if params.dist == 'Normal':
+            s = generate_normal(
+                params.size, params.mean, params.sd, params.lower,
+                params.upper, rng
+            )
+
+        elif params.dist == 'Poisson':
+            s = generate_poisson(
+                params.size, params.lam, params.lower, params.upper, rng
+            )
+
+        elif params.dist == 'Binomial':
+            s = generate_binomial(
+                params.size, params.trials, params.prob, params.lower,
+                params.upper, rng
+            )
+
+        return s
+
     def draw(
-        self, size='', dist='', mean='', sd='', lam='', trials='', prob=''
+        self, size='', dist='', mean='', sd='', lam='', trials='', prob='',
+        lower='', upper=''
     ):
         '''
 
@@ -408,6 +553,10 @@ class DistributionSampler:
         set_parameters() method to update the parameters before validating
         these using the private method.
 
+        For thread safe instances, the parameters passed apply to this call
+        only and the instance is left unchanged (see the thread_safe
+        attribute).
+
         Parameters
         ----------
 
@@ -430,31 +579,50 @@ class DistributionSampler:
         --------
         s = Instance.draw()
         s = Instance.draw(size=1000, dist='Normal', mean=1, sd=2)
+        s = Instance.draw(size=1000, dist='Normal', mean=1, sd=2, lower=0)
         '''
+        if self.thread_safe:
+            params = self._snapshot(
+                size=size, dist=dist, mean=mean, sd=sd, lam=lam,
+                trials=trials, prob=prob, lower=lower, upper=upper
+            )
+            self._validate_parameters(params)
+            return self._generate(params, self._thread_rng())
+
         self.set_parameters(
             size=size, dist=dist, mean=mean, sd=sd, lam=lam, trials=trials,
-            prob=prob
+            prob=prob, lower=lower, upper=upper
         )
         self._validate_parameters()
 
+        # Start from a clean record so bounds from a previous draw don't linger
+        self.sample_parameters = {}
+        self.sample = self._generate(self, np.random)
+
         if self.dist == 'Normal':
-            self.sample = np.random.normal(self.mean, self.sd, self.size)
+            # Bounds shift and narrow the distribution, so the sample moments
+            # are reported rather than the mean and sd parameters.
+            if self.lower is None and self.upper is None:
+                mean, sd = self.mean, self.sd
+
+            else:
+                mean, sd = self.sample.mean(), self.sample.std()
+
             self.sample_parameters['Distribution'] = self.dist
             self.sample_parameters['Sample Size'] = self.size
-            self.sample_parameters['Mean'] = self.mean
-            self.sample_parameters['Standard Deviation'] = self.sd
+            self.sample_parameters['Mean'] = mean
+            self.sample_parameters['Standard Deviation'] = sd
             self.sample_parameters['Minimum Value'] = self.sample.min()
             self.sample_parameters['Maximum Value'] = self.sample.max()
             self.sample_parameters['graph_string'] = (
                 '{} Distribution, Mean: {}, Standard Deviation: {}'.format(
-                    self.dist, self.mean, self.sd
+                    self.dist, mean, sd
                 )
             )
             print('Normal Distribution Created')
             print('')
 
         if self.dist == 'Poisson':
-            self.sample = np.random.poisson(self.lam, self.size)
             self.sample_parameters['Distribution'] = self.dist
             self.sample_parameters['Sample Size'] = self.size
             self.sample_parameters['Lambda'] = self.lam
@@ -471,7 +639,6 @@ class DistributionSampler:
             print('')
 
         if self.dist == 'Binomial':
-            self.sample = np.random.binomial(self.trials, self.prob, self.size)
             self.sample_parameters['Distribution'] = self.dist
             self.sample_parameters['Sample Size'] = self.size
             self.sample_parameters['Trial Size'] = self.trials
@@ -488,9 +655,17 @@ class DistributionSampler:
             print('Binomial Distribution Created')
             print('')
 
+        if self.lower is not None:
+            self.sample_parameters['Lower Bound'] = self.lower
+
+        if self.upper is not None:
+            self.sample_parameters['Upper Bound'] = self.upper
+
         return self.sample
 
-    def summarise(self, graph=True):
+    def summarise(
+        self, graph=True, ci=None, n_boot=1000, max_memory=2 ** 28, workers=1
+    ):
         '''
         Overview
         --------
@@ -510,6 +685,27 @@ class DistributionSampler:
         Defaults to True. Setting this to False will result in no graph being
         created.
 
+        ci , float , optional
+
+        Defaults to None. Setting this to a confidence level (e.g. 0.95) will
+        additionally print bootstrap confidence intervals for the mean,
+        standard deviation, minimum value and maximum value.
+
+        n_boot , integer , optional
+
+        Defaults to 1000. The number of bootstrap resamples used for the
+        confidence intervals.
+
+        max_memory , integer , optional
+
+        Defaults to 256MB. The approximate number of bytes each worker may use
+        for a block of bootstrap resamples.
+
+        workers , integer , optional
+
+        Defaults to 1. The number of threads used to compute the bootstrap
+        resamples.
+
 
         Returns
         -------
@@ -527,6 +723,7 @@ class DistributionSampler:
         --------
         s = Instance.summarise()
         s = Instance.summarise(graph=False)
+        s = Instance.summarise(ci=0.95, n_boot=2000, workers=4)
         '''
         if isinstance(self.sample, np.ndarray):
             print('Summary')
@@ -535,6 +732,17 @@ class DistributionSampler:
                 if key != 'graph_string':
                     print('{}: {}'.format(key, value))
 
+            if ci is not None:
+                intervals = bootstrap_ci(
+                    self.sample, ci=ci, n_boot=n_boot, max_memory=max_memory,
+                    workers=workers
+                )
+                print('')
+                print('{:g}% Confidence Intervals'.format(ci * 100))
+                print('-------------------------')
+                for key, (low, high) in intervals.items():
+                    print('{}: ({}, {})'.format(key, low, high))
+
         else:
             raise ValueError(
                 'You have not yet created a sample to summarise. You can create '
@@ -1,2 +1,3 @@
 from .DistributionSampler import DistributionSampler
 from .distribution_sampler import distribution_sampler
+from .bootstrap import bootstrap_ci
@@ -0,0 +1,255 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+def validate_bootstrap_params(sample, ci, n_boot, max_memory, workers):
+    '''
+    Sub function for the bootstrap_ci function to validate the user input
+    parameters. If the parameters are incorrect, a ValueError is raised to
+    alert the user to change the input parameters
+    '''
+
+    if not isinstance(sample, np.ndarray) or sample.ndim != 1:
+        raise ValueError('The sample must be a one dimensional numpy array.')
+
+    if sample.size == 0:
+        raise ValueError('The sample must contain at least one value.')
+
+    if not isinstance(ci, float) or not (0 < ci < 1):
+        raise ValueError(
+            'The ci parameter must be a float between 0 and 1. E.g. 0.95'
+        )
+
+    for name, value in (
+        ('n_boot', n_boot), ('max_memory', max_memory), ('workers', workers)
+    ):
+        if not isinstance(value, int) or value < 1:
+            raise ValueError(
+                'The {} parameter must be a positive integer.'.format(name)
+            )
+
+
+def block_sizes(n_boot, row_bytes, max_memory):
+    '''
+    Sub function for the bootstrap_ci function. Splits n_boot resamples into
+    blocks, each holding as many resamples as fit into max_memory bytes.
+
+    Returns a list of block sizes summing to n_boot.
+    '''
+    per_block = int(max(1, min(n_boot, max_memory // row_bytes)))
+    full, remainder = divmod(n_boot, per_block)
+    sizes = [per_block] * full
+
+    if remainder:
+        sizes.append(remainder)
+
+    return sizes
+
+
+def index_dtype(n):
+    '''
+    Sub function for the resample_indices function. Returns the smallest
+    integer dtype able to index a sample of size n, halving the memory used by
+    resample indices for samples under 2 ** 31 values.
+    '''
+    if n < 2 ** 31:
+        return np.int32
+
+    return np.int64
+
+
+def resample_indices(sample, block, rng):
+    '''
+    Sub function for the bootstrap_ci function. Draws a block of resamples by
+    indexing the float64 sample with a (block, n) array of random positions
+    and computes the mean and standard deviation of every resample at once.
+    The standard deviation is computed in place, so the index array and the
+    gathered values are the only (block, n) arrays allocated.
+
+    Returns an array of shape (block, 2) holding the means and standard
+    deviations.
+    '''
+    n = sample.size
+    idx = rng.randint(0, n, size=(block, n), dtype=index_dtype(n))
+    resamples = sample[idx]
+    del idx
+
+    out = np.empty((block, 2))
+    out[:, 0] = resamples.mean(axis=1)
+
+    resamples -= out[:, 0][:, np.newaxis]
+    np.square(resamples, out=resamples)
+    out[:, 1] = np.sqrt(resamples.mean(axis=1))
+    return out
+
+
+def resample_counts(values, pvals, n, block, rng):
+    '''
+    Sub function for the bootstrap_ci function. A resample is described by
+    how many times it draws each distinct value, so a block of resamples is a
+    (block, distinct values) multinomial draw rather than a (block, n) index
+    array. The resampled means and standard deviations are exact.
+
+    Returns an array of shape (block, 2) holding the means and standard
+    deviations.
+    '''
+    counts = rng.multinomial(n, pvals, size=block)
+
+    mean = counts.dot(values) / n
+    var = counts.dot(values ** 2) / n - mean ** 2
+
+    out = np.empty((block, 2))
+    out[:, 0] = mean
+    out[:, 1] = np.sqrt(np.maximum(var, 0))
+    return out
+
+
+def extreme_intervals(values, counts, alpha):
+    '''
+    Sub function for the bootstrap_ci function. Calculates the bootstrap
+    intervals for the minimum and maximum exactly from the sorted distinct
+    values. Where F is the share of the sample at or below a value, a resample
+    of n values has its minimum at or below that value with probability
+    1 - (1 - F) ** n, and its maximum with probability F ** n.
+
+    Returns the minimum and maximum intervals as (lower, upper) tuples.
+    '''
+    n = counts.sum()
+    share = np.cumsum(counts) / float(n)
+
+    with np.errstate(divide='ignore'):
+        cdf_min = -np.expm1(n * np.log1p(-share))
+        cdf_max = np.exp(n * np.log(share))
+
+    def quantile(cdf, p):
+        return values[min(np.searchsorted(cdf, p), len(values) - 1)]
+
+    return (
+        (quantile(cdf_min, alpha), quantile(cdf_min, 1 - alpha)),
+        (quantile(cdf_max, alpha), quantile(cdf_max, 1 - alpha))
+    )
+
+
+def bootstrap_ci(sample, ci=0.95, n_boot=1000, max_memory=2 ** 28, workers=1):
+    '''
+
+    Calculates percentile bootstrap confidence intervals for the mean,
+    standard deviation, minimum value and maximum value of a sample.
+
+    Parameters
+    ----------
+    sample : numpy array
+
+    The one dimensional sample to resample.
+
+    ci : float , optional
+
+    The confidence level of the intervals. Defaults to 0.95.
+
+    n_boot : integer , optional
+
+    The number of bootstrap resamples to draw. Defaults to 1000.
+
+    max_memory : integer , optional
+
+    The approximate number of bytes each worker may use for a block of
+    resamples. Defaults to 256MB. This is on top of a few arrays the size of
+    the sample, which are created once per call.
+
+    workers : integer , optional
+
+    The number of threads used to process blocks of resamples. Defaults to 1.
+
+    Returns
+    -------
+
+    intervals : A dictionary mapping each statistic name to a (lower, upper)
+    tuple.
+
+    Notes
+    -----
+
+    The minimum and maximum intervals are calculated exactly from the sorted
+    sample, without resampling.
+
+    The mean and standard deviation are resampled in blocks, with the
+    statistics for a whole block computed in single vectorized numpy calls.
+    The block size is the largest that fits within max_memory. Samples with
+    fewer distinct values than a tenth of their size (e.g. Poisson and
+    Binomial samples) are resampled as multinomial counts over the distinct
+    values, so the cost per resample depends on the number of distinct values
+    rather than the sample size. Other samples are resampled by indexing with
+    random positions, at a cost proportional to the sample size; for large
+    continuous samples, raise workers to spread the blocks over several cores.
+    Both methods are exact.
+
+    Each block is drawn from its own RandomState seeded from the global numpy
+    random state, so results are reproducible with np.random.seed() for any
+    number of workers.
+
+    Examples
+    --------
+    intervals = bootstrap_ci(s)
+    intervals = bootstrap_ci(s, ci=0.9, n_boot=5000, workers=4)
+    '''
+
+    # Validate the parameters
+    validate_bootstrap_params(sample, ci, n_boot, max_memory, workers)
+
+    n = sample.size
+    values, counts = np.unique(sample, return_counts=True)
+    values = values.astype(np.float64)
+
+    # Centre the values so the variance isn't lost to cancellation when the
+    # sample sits far from zero.
+    centre = values.dot(counts) / n
+    centred = values - centre
+
+    if len(values) * 10 <= n:
+        pvals = counts / float(n)
+
+        def run_block(block, rng):
+            return resample_counts(centred, pvals, n, block, rng)
+
+        # The int64 counts per resample
+        row_bytes = len(values) * 8
+
+    else:
+        centred_sample = sample.astype(np.float64) - centre
+
+        def run_block(block, rng):
+            return resample_indices(centred_sample, block, rng)
+
+        # The index array and the gathered float64 values per resample
+        row_bytes = n * (np.dtype(index_dtype(n)).itemsize + 8)
+
+    sizes = block_sizes(n_boot, row_bytes, max_memory)
+    seeds = np.random.randint(0, 2 ** 32 - 1, size=len(sizes), dtype=np.int64)
+
+    def run(i):
+        return run_block(sizes[i], np.random.RandomState(seeds[i]))
+
+    if workers == 1:
+        results = [run(i) for i in range(len(sizes))]
+
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run, range(len(sizes))))
+
+    boot_stats = np.concatenate(results)
+    boot_stats[:, 0] += centre
+
+    alpha = (1 - ci) / 2
+    bounds = np.percentile(
+        boot_stats, [alpha * 100, (1 - alpha) * 100], axis=0
+    )
+    minimum, maximum = extreme_intervals(values, counts, alpha)
+
+    intervals = {
+        'Mean': (bounds[0, 0], bounds[1, 0]),
+        'Standard Deviation': (bounds[0, 1], bounds[1, 1]),
+        'Minimum Value': minimum,
+        'Maximum Value': maximum,
+    }
+
+    return intervals
@@ -1,7 +1,17 @@
+import numbers
 import numpy as np
+from scipy import special, stats
 import warnings
 
 
+# Standardised distance from the mean beyond which the normal CDF can no
+# longer be inverted accurately, so a tail sampler is used instead.
+NORMAL_TAIL = 30
+
+# Tail probability outside which a discrete distribution's bulk is taken to lie
+DISCRETE_TAIL = 1e-16
+
+
 def validate_params(size, dist, mean, sd, lam, trials, prob):
     '''
     Sub function for the distribution_sampler function to validate the
@@ -74,41 +84,272 @@ def validate_params(size, dist, mean, sd, lam, trials, prob):
             )
 
 
-def generate_normal(size, mean, sd):
+def validate_bounds(dist, lower, upper):
+    '''
+    Sub function for the distribution_sampler function to validate the
+    lower and upper bounds. If the bounds are not numeric or do not describe
+    a valid range, a ValueError is raised.
+    '''
+
+    for name, bound in (('lower', lower), ('upper', upper)):
+        if bound is None:
+            continue
+
+        if isinstance(bound, bool) or not isinstance(bound, numbers.Real):
+            raise ValueError(
+                'The {} parameter must be an integer or a float.'.format(name)
+            )
+
+        if np.isnan(bound):
+            raise ValueError('The {} parameter must not be NaN.'.format(name))
+
+    if (lower is not None) and (upper is not None) and (lower > upper):
+        raise ValueError(
+            'The lower parameter must be less than or equal to the upper '
+            'parameter.'
+        )
+
+    # Poisson and Binomial samples are integers, so the bounds must contain
+    # at least one whole number.
+    if dist in ['Poisson', 'Binomial']:
+        if (
+            (lower is not None) and (upper is not None) and
+            (np.ceil(lower) > np.floor(upper))
+        ):
+            raise ValueError(
+                'The lower and upper parameters must contain at least one '
+                "integer where dist is 'Poisson' or 'Binomial'"
+            )
+
+
+def normal_tail(size, a, b, rng=np.random):
+    '''
+    Sub function for the truncated_normal function. Generates standard normal
+    samples restricted to [a, b], where a is far above the mean, by drawing
+    from the Rayleigh tail x * exp(-x ** 2 / 2) by inversion and accepting
+    with probability a / x (Marsaglia's tail method). Beyond NORMAL_TAIL
+    standard deviations over 99.8% of draws are accepted, so the cost per
+    value is constant however little mass the range holds.
+
+    Returns the generated sample as z.
+    '''
+    # The share of the Rayleigh tail beyond a which lies below b
+    with np.errstate(over='ignore'):
+        share = -np.expm1(-(b - a) * (b + a) / 2)
+
+    z = np.empty(size)
+    todo = np.arange(size)
+
+    while todo.size:
+        u = rng.random_sample(todo.size)
+        v = rng.random_sample(todo.size)
+        x = np.sqrt(a * a - 2 * np.log1p(-u * share))
+        accept = v * x <= a
+
+        z[todo[accept]] = np.minimum(x[accept], b)
+        todo = todo[~accept]
+
+    return z
+
+
+def truncated_normal(size, mean, sd, lower, upper, rng=np.random):
+    '''
+    Sub function for the generate_normal function. Generates samples from a
+    normal distribution restricted to [lower, upper] using the inverse CDF,
+    or the normal_tail function for ranges more than NORMAL_TAIL standard
+    deviations from the mean, so the cost per value is constant regardless of
+    the truncated mass.
+
+    Returns the generated sample as s.
+    '''
+    a = -np.inf if lower is None else (lower - mean) / sd
+    b = np.inf if upper is None else (upper - mean) / sd
+
+    if a >= NORMAL_TAIL:
+        z = normal_tail(size, a, b, rng)
+
+    elif b <= -NORMAL_TAIL:
+        z = -normal_tail(size, -b, -a, rng)
+
+    else:
+        # The CDF loses precision in the upper tail, so ranges above the mean
+        # are mirrored into the lower tail and flipped back afterwards.
+        flip = a > 0
+        if flip:
+            a, b = -b, -a
+
+        cdf_a = special.ndtr(a)
+        cdf_b = special.ndtr(b)
+
+        if cdf_b > cdf_a:
+            u = cdf_a + (cdf_b - cdf_a) * rng.random_sample(size)
+            z = np.clip(special.ndtri(u), a, b)
+
+        else:
+            # The range is narrower than the CDF can resolve (e.g. lower
+            # equals upper), so every value is effectively its midpoint.
+            z = np.full(size, (a + b) / 2)
+
+        if flip:
+            z = -z
+
+    s = mean + sd * z
+    return s
+
+
+def discrete_bulk(frozen, support_max):
+    '''
+    Sub function for the truncated_discrete function. Returns the range
+    outside which a frozen scipy discrete distribution has less than
+    DISCRETE_TAIL probability on either side. scipy returns NaN for the
+    quantiles of very large distributions (e.g. a Poisson with lam=1e12), in
+    which case the range is taken as 40 standard deviations either side of
+    the mean.
+    '''
+    low = frozen.ppf(DISCRETE_TAIL)
+    high = frozen.isf(DISCRETE_TAIL)
+
+    if not np.isfinite(low):
+        low = max(0, np.floor(frozen.mean() - 40 * frozen.std()))
+
+    if not np.isfinite(high):
+        high = min(support_max, np.ceil(frozen.mean() + 40 * frozen.std()))
+
+    return low, high
+
+
+def truncated_discrete(
+    size, frozen, lower, upper, draw, support_max=np.inf, rng=np.random
+):
+    '''
+    Sub function for the generate_poisson and generate_binomial functions.
+    Generates samples from a frozen scipy discrete distribution restricted to
+    [lower, upper].
+
+    Where the bounds don't cut into the bulk of the distribution, values are
+    taken from draw (a function returning an unbounded sample of a given
+    size), and the rare values outside the bounds are redrawn.
+
+    Otherwise, uniform draws are looked up in a cumulative probability table.
+    The table only spans the part of the range carrying non-negligible mass,
+    so its size depends on the spread of the distribution rather than the
+    width of the bounds.
+
+    Returns the generated sample as s.
+    '''
+    lo = 0 if lower is None else max(0, np.ceil(lower))
+    hi = support_max if upper is None else min(support_max, np.floor(upper))
+
+    if lo > hi:
+        raise ValueError(
+            'The lower and upper parameters lie outside the support of the '
+            'distribution.'
+        )
+
+    bulk_low, bulk_high = discrete_bulk(frozen, support_max)
+
+    if lo <= bulk_low and hi >= bulk_high:
+        s = draw(size)
+        outside = np.flatnonzero((s < lo) | (s > hi))
+
+        while outside.size:
+            redraw = draw(outside.size)
+            s[outside] = redraw
+            outside = outside[(redraw < lo) | (redraw > hi)]
+
+        return s
+
+    # Window the table around the bulk of the distribution, clamped to the
+    # bounds. Beyond the bulk the probabilities decay at least geometrically,
+    # so padding by a multiple of the standard deviation covers the tail.
+    pad = 10 * frozen.std() + 10
+    start = max(lo, min(hi, bulk_low) - pad)
+    stop = min(hi, max(lo, bulk_high) + pad)
+
+    k = np.arange(int(start), int(stop) + 1, dtype=np.int64)
+    log_pmf = frozen.logpmf(k)
+
+    if not np.isfinite(log_pmf.max()):
+        raise ValueError(
+            'The lower and upper parameters describe a range with negligible '
+            'probability mass for the given distribution parameters.'
+        )
+
+    cdf = np.cumsum(np.exp(log_pmf - log_pmf.max()))
+
+    u = rng.random_sample(size) * cdf[-1]
+    idx = np.minimum(np.searchsorted(cdf, u, side='right'), len(k) - 1)
+
+    s = k[idx]
+    return s
+
+
+def generate_normal(size, mean, sd, lower=None, upper=None, rng=np.random):
     '''
     Sub function for the distribution_sampler function. Generates samples from
-    a normal distribution based upon the size, mean and sd parameters.
+    a normal distribution based upon the size, mean and sd parameters,
+    optionally restricted to the lower and upper bounds. Values are drawn from
+    rng, which defaults to the global numpy random state.
 
     Returns the generated sample as s.
     '''
-    s = np.random.normal(mean, sd, size)
+    if (lower is None) and (upper is None):
+        s = rng.normal(mean, sd, size)
+
+    else:
+        s = truncated_normal(size, mean, sd, lower, upper, rng)
+
     return s
 
 
-def generate_poisson(size, lam):
+def generate_poisson(size, lam, lower=None, upper=None, rng=np.random):
     '''
     Sub function for the distribution_sampler function. Generates samples from
-    a poisson distribution based upon the size and lam parameters.
+    a poisson distribution based upon the size and lam parameters, optionally
+    restricted to the lower and upper bounds. Values are drawn from rng, which
+    defaults to the global numpy random state.
 
     Returns the generated sample as s.
     '''
-    s = np.random.poisson(lam, size)
+    if (lower is None) and (upper is None):
+        s = rng.poisson(lam, size)
+
+    else:
+        s = truncated_discrete(
+            size, stats.poisson(lam), lower, upper,
+            lambda n: rng.poisson(lam, n), rng=rng
+        )
+
     return s
 
 
-def generate_binomial(size, trials, prob):
+def generate_binomial(
+    size, trials, prob, lower=None, upper=None, rng=np.random
+):
     '''
     Sub function for the distribution_sampler function. Generates samples from
-    a binomial distribution based upon the size, trials and prob parameters.
+    a binomial distribution based upon the size, trials and prob parameters,
+    optionally restricted to the lower and upper bounds. Values are drawn from
+    rng, which defaults to the global numpy random state.
 
     Returns the generated sample as s.
     '''
-    s = np.random.binomial(trials, prob, size)
+    if (lower is None) and (upper is None):
+        s = rng.binomial(trials, prob, size)
+
+    else:
+        s = truncated_discrete(
+            size, stats.binom(trials, prob), lower, upper,
+            lambda n: rng.binomial(trials, prob, n), support_max=trials,
+            rng=rng
+        )
+
     return s
 
 
 def distribution_sampler(
-    size, dist, mean=None, sd=None, lam=None, trials=None, prob=None
+    size, dist, mean=None, sd=None, lam=None, trials=None, prob=None,
+    lower=None, upper=None
 ):
 
     '''
@@ -152,6 +393,18 @@ def distribution_sampler(
     Applicable to Binomial distributions only. The prob parameter is used to
     dicitate the probability of a trial being successful.
 
+    lower: float / int , optional
+
+    The smallest value that may be drawn. Applicable to all distributions.
+
+    upper: float / int , optional
+
+    The largest value that may be drawn. Applicable to all distributions.
+
+    Bounded samples are drawn directly from the restricted range using the
+    inverse CDF (Normal) or a cumulative probability table (Poisson and
+    Binomial), so no values are rejected.
+
 
     Returns
     -------
@@ -170,19 +423,22 @@ def distribution_sampler(
     s = distribution_sampler(1000, 'Normal', mean=0, sd = 5)
     s = distribution_sampler(1000, 'Poisson', lam=5)
     s = distribution_sampler(1000, 'Binomial', trials=5, prob=0.5)
+    s = distribution_sampler(1000, 'Normal', mean=50, sd=30, lower=0, upper=99)
+    s = distribution_sampler(1000, 'Poisson', lam=5, upper=3)
     '''
 
     # Validate the parameters
     validate_params(size, dist, mean, sd, lam, trials, prob)
+    validate_bounds(dist, lower, upper)
 
     # Generate the appropriate distribution sample
     if dist == 'Normal':
-        s = generate_normal(size, mean, sd)
+        s = generate_normal(size, mean, sd, lower, upper)
 
     elif dist == 'Poisson':
-        s = generate_poisson(size, lam)
+        s = generate_poisson(size, lam, lower, upper)
 
     elif dist == 'Binomial':
-        s = generate_binomial(size, trials, prob)
+        s = generate_binomial(size, trials, prob, lower, upper)
 
     return s
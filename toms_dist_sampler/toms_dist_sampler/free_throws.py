@@ -0,0 +1,293 @@
+'''
+Vectorized feature engineering for the NBA free throws data used in
+1. Analysis.ipynb.
+
+Builds the same features as the notebook, but with whole-column operations
+instead of row-wise DataFrame.apply() calls and dictionary replaces. The CSV is
+read with compact dtypes and categoricals. String columns are parsed once per
+distinct value (e.g. the ~720 distinct clock times) rather than once per row,
+and the file can be processed in chunks.
+
+Examples
+--------
+df = build_features('./data/input/free_throws.csv')
+df = build_features('./data/input/free_throws.csv', chunksize=100000)
+'''
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype, union_categoricals
+
+
+# Explicit dtypes for free_throws.csv. period and game_id are written with a
+# trailing .0, so are read as floats.
+FREE_THROW_DTYPES = {
+    'end_result': 'category',
+    'game': 'category',
+    'game_id': 'float64',
+    'period': 'float32',
+    'play': 'category',
+    'player': 'category',
+    'playoffs': 'category',
+    'score': 'category',
+    'season': 'category',
+    'shot_made': 'int8',
+    'time': 'category',
+}
+
+# The column order of the notebook's output
+FEATURE_COLUMNS = [
+    'season',
+    'game_id',
+    'game',
+    'playoffs',
+    'home_team',
+    'away_team',
+    'period',
+    'play',
+    'player',
+    'throw_number',
+    'shot_taken',
+    'shot_scored',
+    'shot_missed',
+    'scored_missed',
+    'score',
+    'end_result',
+    'in_overtime',
+    'period_time_elapsed',
+    'period_time_remaining',
+    'game_time_elapsed',
+    'game_time_remaining'
+]
+
+REGULATION_PERIODS = 4
+PERIOD_MINUTES = 12
+OVERTIME_MINUTES = 5
+
+
+def read_free_throws(path, chunksize=None):
+    '''
+
+    Reads free_throws.csv using the compact dtypes in FREE_THROW_DTYPES.
+
+    Parameters
+    ----------
+    path : string
+
+    The path to free_throws.csv.
+
+    chunksize : integer , optional
+
+    If set, an iterator of DataFrames holding chunksize rows each is returned
+    instead of a single DataFrame.
+
+    Returns
+    -------
+
+    df : A pandas DataFrame, or an iterator of DataFrames if chunksize is set.
+
+    Examples
+    --------
+    df = read_free_throws('./data/input/free_throws.csv')
+    '''
+    return pd.read_csv(path, dtype=FREE_THROW_DTYPES, chunksize=chunksize)
+
+
+def map_categories(column, func):
+    '''
+    Sub function for the add_features function. Applies func, a function
+    taking and returning a Series, to the distinct values of a categorical
+    column only.
+
+    Returns a categorical Series holding the result for every row.
+    '''
+    column = column.astype('category')
+    values = func(pd.Series(column.cat.categories))
+
+    # Results may repeat across categories (e.g. the home team of two games),
+    # so they are factorized and the row codes translated to the new codes.
+    new_codes, uniques = pd.factorize(values)
+    codes = column.cat.codes.values
+    row_codes = np.where(codes == -1, -1, new_codes[codes])
+
+    return pd.Series(
+        pd.Categorical.from_codes(row_codes, uniques), index=column.index
+    )
+
+
+def time_to_seconds(time):
+    '''
+    Sub function for the add_features function. Converts a column of 'MM:SS'
+    clock strings to a float array of seconds, parsing each distinct clock
+    string once.
+    '''
+    time = time.astype('category')
+
+    # A chunk may hold only missing times, leaving no categories to split
+    if len(time.cat.categories) == 0:
+        return np.full(len(time), np.nan)
+
+    parts = pd.Series(time.cat.categories).str.split(':', expand=True)
+    seconds = (
+        parts[0].astype(np.float64) * 60 + parts[1].astype(np.float64)
+    ).values
+
+    codes = time.cat.codes.values
+    return np.where(codes == -1, np.nan, seconds[codes])
+
+
+def period_features(period):
+    '''
+    Sub function for the add_features function. Calculates the periods
+    remaining in regulation, whether the period is in overtime and the number
+    of completed overtime periods from an integer period array. These replace
+    the notebook's period dictionaries, and extend them to any number of
+    overtime periods.
+
+    Returns the three arrays as periods_remaining, in_overtime and
+    overtime_periods_played.
+    '''
+    periods_remaining = np.clip(REGULATION_PERIODS - period, 0, None)
+    in_overtime = (period > REGULATION_PERIODS).astype(np.int8)
+    overtime_periods_played = np.clip(
+        period - REGULATION_PERIODS - 1, 0, None
+    )
+    return periods_remaining, in_overtime, overtime_periods_played
+
+
+def add_features(df):
+    '''
+
+    Creates the features built in 1. Analysis.ipynb from a DataFrame read from
+    free_throws.csv (e.g. by read_free_throws()).
+
+    Parameters
+    ----------
+    df : pandas DataFrame
+
+    The free throws data, with the columns of free_throws.csv.
+
+    Returns
+    -------
+
+    features : A new pandas DataFrame with the columns in FEATURE_COLUMNS.
+
+    Notes
+    -----
+
+    Times are returned as pandas timedeltas, matching the notebook, with NaT
+    where the clock time is missing. period and in_overtime are returned as
+    int8s rather than a float and an int64, and the string features
+    (including throw_number) are returned as categoricals.
+
+    Examples
+    --------
+    features = add_features(read_free_throws('./data/input/free_throws.csv'))
+    '''
+    period = df['period'].values.astype(np.int64)
+    periods_remaining, in_overtime, overtime_periods_played = (
+        period_features(period)
+    )
+
+    # Clock times in seconds
+    period_time_remaining = time_to_seconds(df['time'])
+    period_length = np.where(
+        in_overtime == 1, OVERTIME_MINUTES, PERIOD_MINUTES
+    ) * 60
+    period_time_elapsed = period_length - period_time_remaining
+
+    game_time_remaining = (
+        np.where(in_overtime == 1, 0, periods_remaining * PERIOD_MINUTES) * 60
+        + period_time_remaining
+    )
+    regulation_minutes = REGULATION_PERIODS * PERIOD_MINUTES
+    game_time_elapsed = np.where(
+        in_overtime == 1,
+        (regulation_minutes + overtime_periods_played * OVERTIME_MINUTES) * 60
+        + period_time_elapsed,
+        regulation_minutes * 60 - game_time_remaining
+    )
+
+    shot_scored = df['shot_made'].values.astype(np.int8)
+
+    features = pd.DataFrame({
+        'season': df['season'],
+        'game_id': df['game_id'],
+        'game': df['game'],
+        'playoffs': df['playoffs'],
+        'home_team': map_categories(df['game'], lambda s: s.str[:3]),
+        'away_team': map_categories(df['game'], lambda s: s.str[6:9]),
+        'period': period.astype(np.int8),
+        'play': df['play'],
+        'player': df['player'],
+        'throw_number': map_categories(df['play'], lambda s: s.str[-6]),
+        'shot_taken': np.ones(len(df), dtype=np.int8),
+        'shot_scored': shot_scored,
+        'shot_missed': 1 - shot_scored,
+        'scored_missed': pd.Categorical.from_codes(
+            shot_scored, ['Missed', 'Scored']
+        ),
+        'score': df['score'],
+        'end_result': df['end_result'],
+        'in_overtime': in_overtime,
+        'period_time_elapsed': pd.to_timedelta(period_time_elapsed, unit='s'),
+        'period_time_remaining': pd.to_timedelta(
+            period_time_remaining, unit='s'
+        ),
+        'game_time_elapsed': pd.to_timedelta(game_time_elapsed, unit='s'),
+        'game_time_remaining': pd.to_timedelta(game_time_remaining, unit='s'),
+    }, index=df.index)
+
+    return features[FEATURE_COLUMNS]
+
+
+def concat_features(chunks):
+    '''
+    Sub function for the build_features function. Concatenates DataFrames of
+    features, unioning the categories of categorical columns so they stay
+    categorical rather than falling back to object columns.
+    '''
+    chunks = list(chunks)
+    df = pd.concat(chunks, ignore_index=True)
+
+    for column in chunks[0].columns:
+        if isinstance(chunks[0][column].dtype, CategoricalDtype):
+            df[column] = union_categoricals(
+                [chunk[column] for chunk in chunks]
+            )
+
+    return df
+
+
+def build_features(path, chunksize=None):
+    '''
+
+    Reads free_throws.csv and creates the features built in
+    1. Analysis.ipynb.
+
+    Parameters
+    ----------
+    path : string
+
+    The path to free_throws.csv.
+
+    chunksize : integer , optional
+
+    If set, the file is read and processed chunksize rows at a time, keeping
+    only the (compact) features of each chunk in memory.
+
+    Returns
+    -------
+
+    features : A pandas DataFrame with the columns in FEATURE_COLUMNS.
+
+    Examples
+    --------
+    df = build_features('./data/input/free_throws.csv')
+    df = build_features('./data/input/free_throws.csv', chunksize=100000)
+    '''
+    if chunksize is None:
+        return add_features(read_free_throws(path))
+
+    return concat_features(
+        add_features(chunk) for chunk in read_free_throws(path, chunksize)
+    )
@@ -0,0 +1,510 @@
+'''
+A local sampling service, letting several processes share one sampler.
+
+The server speaks HTTP over localhost or a Unix socket. POST a JSON sampler
+spec matching the distribution_sampler() signature to /sample and the sample
+is returned as a raw little-endian buffer, with its dtype in the X-Dtype
+header. GET /metrics returns latency and throughput metrics as JSON.
+
+Concurrent requests for identical distributions (the same spec apart from
+size) are coalesced into a single batched draw, which is then split between
+the requests.
+
+Starting a server from the command line:
+python -m toms_dist_sampler.server --port 8000
+python -m toms_dist_sampler.server --socket /tmp/sampler.sock
+
+Using the bundled client:
+client = SamplerClient(('127.0.0.1', 8000))
+s = client.sample(1000, 'Normal', mean=0, sd=5)
+client.metrics()
+'''
+from collections import deque
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn, ThreadingUnixStreamServer
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+import numpy as np
+
+from .DistributionSampler import DistributionSampler
+from .distribution_sampler import validate_bounds, validate_params
+
+
+SPEC_KEYS = [
+    'size', 'dist', 'mean', 'sd', 'lam', 'trials', 'prob', 'lower', 'upper'
+]
+
+# Exceptions raised by validation which are passed back to the client
+CLIENT_ERRORS = {'ValueError': ValueError, 'NameError': NameError}
+
+# The largest sample a single request may ask for (1GB of float64 values)
+MAX_SIZE = 2 ** 27
+
+
+def validate_spec(spec):
+    '''
+    Sub function for the SampleBatcher class to validate a sampler spec
+    received by the server. If the spec is not a dictionary of
+    distribution_sampler() parameters, or the parameters are incorrect, an
+    error is raised to be returned to the client.
+    '''
+
+    if not isinstance(spec, dict):
+        raise ValueError('The request body must be a JSON object.')
+
+    unknown = set(spec) - set(SPEC_KEYS)
+    if unknown:
+        raise ValueError(
+            'Unknown parameters: {}. Applicable parameters are: {}'.format(
+                ', '.join(sorted(unknown)), ', '.join(SPEC_KEYS)
+            )
+        )
+
+    for key, value in spec.items():
+        if key == 'dist' or value is None:
+            continue
+
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(
+                'The {} parameter must be an integer or a float.'.format(key)
+            )
+
+    params = dict.fromkeys(SPEC_KEYS)
+    params.update(spec)
+
+    validate_params(
+        params['size'], params['dist'], params['mean'], params['sd'],
+        params['lam'], params['trials'], params['prob']
+    )
+    validate_bounds(params['dist'], params['lower'], params['upper'])
+
+    if not (1 <= params['size'] <= MAX_SIZE):
+        raise ValueError(
+            'The size parameter must be between 1 and {}.'.format(MAX_SIZE)
+        )
+
+    return params
+
+
+class SampleBatcher:
+    def __init__(self, window=0.002, seed=None):
+        '''
+        Coalesces concurrent requests for identical distributions into a
+        single draw. The first request for a distribution waits window
+        seconds for others to join, draws one sample covering every request
+        in the batch and hands each request its slice.
+
+        The wait trades latency for batching: it adds up to window seconds to
+        a request, in exchange for fewer, larger draws under load. A request
+        arriving while no other requests are in flight skips the wait and is
+        drawn immediately, so an idle server adds no latency.
+
+        A batch never draws more than MAX_SIZE values in total. A request
+        which would take its batch past MAX_SIZE starts a new batch instead.
+
+        Draws come from a thread safe DistributionSampler, so batches for
+        different distributions are drawn concurrently on independent random
+        streams. Passing a seed makes the streams reproducible.
+        '''
+        self.window = window
+        self.sampler = DistributionSampler(thread_safe=True, seed=seed)
+        self._pending = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def sample(self, spec):
+        '''
+        Validates spec, adds it to the batch for its distribution and returns
+        the slice of the batched sample belonging to this request, along with
+        the number of requests in the batch.
+        '''
+        params = validate_spec(spec)
+        size = params.pop('size')
+        key = tuple(sorted(params.items()))
+        entry = {'size': size, 'done': threading.Event()}
+
+        with self._lock:
+            self._in_flight += 1
+            concurrent = self._in_flight > 1
+            batch = self._pending.get(key)
+            leader = batch is None or batch['total'] + size > MAX_SIZE
+
+            if leader:
+                batch = self._pending[key] = {'entries': [], 'total': 0}
+
+            batch['entries'].append(entry)
+            batch['total'] += size
+
+        try:
+            if leader:
+                # Only wait for others to join if there are requests in flight
+                # which could do so.
+                if concurrent:
+                    time.sleep(self.window)
+
+                # A full batch may already have been replaced by a new one
+                with self._lock:
+                    if self._pending.get(key) is batch:
+                        del self._pending[key]
+
+                self._draw(params, batch['entries'])
+
+            entry['done'].wait()
+
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        if 'error' in entry:
+            raise entry['error']
+
+        return entry['sample'], entry['batch_size']
+
+    def _draw(self, params, batch):
+        '''
+        Private function to draw a single sample for every request in the
+        batch and split it between them.
+        '''
+        sizes = [entry['size'] for entry in batch]
+
+        try:
+            s = self.sampler.draw(size=sum(sizes), **params)
+            parts = np.split(s, np.cumsum(sizes)[:-1])
+
+            for entry, part in zip(batch, parts):
+                entry['sample'] = part
+                entry['batch_size'] = len(batch)
+
+        except Exception as e:
+            for entry in batch:
+                entry['error'] = e
+
+        for entry in batch:
+            entry['done'].set()
+
+
+class SamplerMetrics:
+    def __init__(self, history=10000):
+        '''
+        Thread safe latency and throughput metrics for the server. Latency
+        percentiles are calculated over the most recent history requests.
+        '''
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.values = 0
+        self.bytes = 0
+        self.batches = 0
+        self.latencies = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def record(self, latency, values=0, nbytes=0, batch_size=None):
+        '''
+        Records a completed request. A batch_size of None marks a failed
+        request. Each batch is counted once, by the fraction each of its
+        requests contributes.
+        '''
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(latency)
+
+            if batch_size is None:
+                self.errors += 1
+
+            else:
+                self.values += values
+                self.bytes += nbytes
+                self.batches += 1.0 / batch_size
+
+    def summary(self):
+        '''
+        Returns the current metrics as a dictionary.
+        '''
+        with self._lock:
+            uptime = time.time() - self.started
+            latencies = np.array(self.latencies)
+            summary = {
+                'uptime_seconds': uptime,
+                'requests': self.requests,
+                'errors': self.errors,
+                'batches': int(round(self.batches)),
+                'values': self.values,
+                'bytes': self.bytes,
+                'requests_per_second': self.requests / uptime,
+                'values_per_second': self.values / uptime,
+            }
+
+            if self.batches:
+                summary['mean_batch_size'] = (
+                    (self.requests - self.errors) / self.batches
+                )
+
+        if len(latencies):
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            summary['latency_seconds'] = {
+                'mean': latencies.mean(), 'p50': p50, 'p90': p90, 'p99': p99,
+                'max': latencies.max()
+            }
+
+        return summary
+
+
+class SampleRequestHandler(BaseHTTPRequestHandler):
+    '''
+    Handles requests to the sampling service. The server is expected to have
+    batcher and metrics attributes (see make_server()).
+    '''
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        if self.path != '/sample':
+            self._send_json(404, {'error': 'Not found: {}'.format(self.path)})
+            return
+
+        start = time.perf_counter()
+
+        try:
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+
+            except ValueError:
+                raise ValueError(
+                    'The Content-Length header must be an integer.'
+                )
+
+            if length < 0:
+                raise ValueError(
+                    'The Content-Length header must not be negative.'
+                )
+
+            try:
+                spec = json.loads(self.rfile.read(length).decode('utf-8'))
+
+            except ValueError:
+                raise ValueError('The request body must be valid JSON.')
+
+            s, batch_size = self.server.batcher.sample(spec)
+            dtype = s.dtype.newbyteorder('<')
+            body = np.ascontiguousarray(s, dtype=dtype).tobytes()
+
+        except (ValueError, NameError) as e:
+            self.server.metrics.record(time.perf_counter() - start)
+            self._send_json(400, {'error': str(e), 'type': type(e).__name__})
+            return
+
+        except Exception as e:
+            # Anything else is a server failure (e.g. a MemoryError), which
+            # is reported rather than dropping the connection.
+            self.server.metrics.record(time.perf_counter() - start)
+            self._send_json(500, {
+                'error': '{}: {}'.format(type(e).__name__, e),
+                'type': type(e).__name__
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Dtype', dtype.str)
+        self.send_header('X-Batch-Size', str(batch_size))
+        self.end_headers()
+        self.wfile.write(body)
+
+        self.server.metrics.record(
+            time.perf_counter() - start, len(s), len(body), batch_size
+        )
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self._send_json(404, {'error': 'Not found: {}'.format(self.path)})
+            return
+
+        self._send_json(200, self.server.metrics.summary())
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Request logging would dominate the cost of small requests, and Unix
+        # socket clients have no address to log. Use /metrics instead.
+        pass
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    # Bursts of concurrent requests are what batching is for, so queue them
+    # rather than refusing connections beyond the default backlog of 5.
+    request_queue_size = 128
+
+
+class ThreadingUnixHTTPServer(ThreadingUnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_server(address, batch_window=0.002, seed=None):
+    '''
+
+    Creates a sampling server, ready to be started with serve_forever().
+
+    Parameters
+    ----------
+    address : tuple / string
+
+    A (host, port) tuple to serve HTTP over TCP, or a file path to serve HTTP
+    over a Unix socket. Use port 0 to pick a free port, which can then be
+    read from server.server_address.
+
+    batch_window : float , optional
+
+    The number of seconds the first request for a distribution waits for
+    identical requests to join its batch. Defaults to 0.002. The wait is
+    skipped when no other requests are in flight, so it only adds latency
+    under concurrent load, where it buys larger batches.
+
+    seed : integer , optional
+
+    Seeds the server's random streams. Defaults to None.
+
+    Returns
+    -------
+
+    server : A socketserver server with batcher and metrics attributes.
+
+    Examples
+    --------
+    server = make_server(('127.0.0.1', 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = SamplerClient(server.server_address)
+    '''
+    if isinstance(address, str):
+        server = ThreadingUnixHTTPServer(address, SampleRequestHandler)
+
+    else:
+        server = ThreadingHTTPServer(address, SampleRequestHandler)
+
+    server.batcher = SampleBatcher(window=batch_window, seed=seed)
+    server.metrics = SamplerMetrics()
+    return server
+
+
+class UnixHTTPConnection(HTTPConnection):
+    '''
+    An HTTPConnection over a Unix socket, used by SamplerClient.
+    '''
+    def __init__(self, path, timeout=None):
+        HTTPConnection.__init__(self, 'localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class SamplerClient:
+    def __init__(self, address, timeout=60):
+        '''
+        A client for the sampling service. The address is the (host, port)
+        tuple or Unix socket path the server was created with. Each client
+        keeps one connection open, so use one client per thread.
+
+        Examples
+        --------
+        client = SamplerClient(('127.0.0.1', 8000))
+        client = SamplerClient('/tmp/sampler.sock')
+        s = client.sample(1000, 'Poisson', lam=5)
+        '''
+        if isinstance(address, str):
+            self.connection = UnixHTTPConnection(address, timeout=timeout)
+
+        else:
+            host, port = address[:2]
+            self.connection = HTTPConnection(host, port, timeout=timeout)
+
+    def _request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'} if body else {}
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def sample(
+        self, size, dist, mean=None, sd=None, lam=None, trials=None,
+        prob=None, lower=None, upper=None
+    ):
+        '''
+        Requests a sample from the server. Takes the same parameters as
+        distribution_sampler() and returns a numpy array. Invalid parameters
+        raise the same ValueError or NameError as distribution_sampler(),
+        and failures on the server raise a RuntimeError.
+        '''
+        spec = {
+            'size': size, 'dist': dist, 'mean': mean, 'sd': sd, 'lam': lam,
+            'trials': trials, 'prob': prob, 'lower': lower, 'upper': upper
+        }
+        spec = {key: value for key, value in spec.items() if value is not None}
+
+        response, body = self._request(
+            'POST', '/sample', json.dumps(spec).encode('utf-8')
+        )
+
+        if response.status != 200:
+            error = json.loads(body.decode('utf-8'))
+            errors = CLIENT_ERRORS if response.status == 400 else {}
+            raise errors.get(error.get('type'), RuntimeError)(error['error'])
+
+        return np.frombuffer(body, dtype=response.getheader('X-Dtype'))
+
+    def metrics(self):
+        '''
+        Returns the server's latency and throughput metrics as a dictionary.
+        '''
+        response, body = self._request('GET', '/metrics')
+        return json.loads(body.decode('utf-8'))
+
+    def close(self):
+        self.connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Runs a local toms_dist_sampler sampling service.'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument(
+        '--socket', help='Serve over this Unix socket path instead of TCP.'
+    )
+    parser.add_argument('--batch-window', type=float, default=0.002)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    address = args.socket or (args.host, args.port)
+    server = make_server(address, args.batch_window, args.seed)
+    print('Serving on {}'.format(server.server_address))
+
+    try:
+        server.serve_forever()
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        server.server_close()
+
+        if args.socket:
+            os.unlink(args.socket)
+
+
+if __name__ == '__main__':
+    main()